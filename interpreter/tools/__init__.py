@@ -1,5 +1,16 @@
 import os
 
+# Use uvloop for the event loop when available; asyncpg and the async tools
+# get a sizable round-trip throughput boost from the libuv-backed loop.
+# Set INTERPRETER_DISABLE_UVLOOP=true to keep the default loop.
+if os.environ.get("INTERPRETER_DISABLE_UVLOOP", "").lower() != "true":
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
 from .base import CLIResult, ToolResult
 from .collection import ToolCollection
 from .computer import ComputerTool
@@ -7,10 +7,26 @@ import asyncio
 import datetime
 import json
 import os
+import re
 import time
+from collections import OrderedDict, defaultdict
 from typing import Any, ClassVar, Dict, List, Literal, Optional, Union
 
 import asyncpg
+import numpy as np
+
+# Prefer orjson for metadata (de)serialization when available; it is a few
+# times faster than stdlib json on both encode and decode
+try:
+    import orjson
+
+    def _json_encode(value):
+        return orjson.dumps(value).decode()
+
+    _json_decode = orjson.loads
+except ImportError:
+    _json_encode = json.dumps
+    _json_decode = json.loads
 from anthropic.types.beta import BetaToolUnionParam
 
 from .base import BaseAnthropicTool, ToolResult
@@ -21,6 +37,99 @@ SHORT_TERM_DECAY_HOURS = 24  # Short term memories start decaying after this tim
 MEMORY_HALF_LIFE_DAYS = 30  # Memories lose half their importance after this many days
 RECENCY_WEIGHT = 0.7  # Weight given to recency vs frequency in memory ranking
 FREQUENCY_WEIGHT = 0.3  # Weight given to frequency vs recency in memory ranking
+ACCESS_FLUSH_INTERVAL = 0.5  # Seconds between flushes of buffered access updates
+ACCESS_FLUSH_CHUNK = 500  # Max ids per batched access UPDATE statement
+
+# Connection settings for the long-term memory database
+DB_SETTINGS = {
+    "user": "postgres",
+    "password": "Bfoster15!",
+    "database": "postgres",
+    "host": "localhost",
+    "port": 5432,
+}
+
+# Hot-path SQL, prepared once per pooled connection in _init_connection()
+SQL_INSERT_MEMORY = '''
+    INSERT INTO memories (content, metadata, tags, created_at, last_accessed, access_count)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id
+'''
+
+SQL_UPDATE_ACCESS = '''
+    UPDATE memories
+    SET access_count = access_count + 1, last_accessed = CURRENT_TIMESTAMP
+    FROM unnest($1::int[]) AS v(id)
+    WHERE memories.id = v.id
+'''
+
+SQL_DELETE_BY_ID = 'DELETE FROM memories WHERE id = $1'
+
+SQL_DELETE_OLDER_THAN = 'DELETE FROM memories WHERE created_at < $1'
+
+# Tokenizer feeding the short-term inverted index
+_TOKEN_RE = re.compile(r'\w+')
+
+# Layout of the per-slot numeric fields used to score short-term memories
+_ST_STATS_DTYPE = np.dtype([('created', 'f8'), ('access', 'i4')])
+
+_BLOOM_BITS = 1024  # Width of the short-term token bloom filter
+
+
+class _TokenBloom:
+    """
+    Tiny bloom filter over short-term content tokens, kept as one Python int.
+    A query token that misses here cannot be in any short-term memory, so
+    recall can bail out before touching the inverted index. False positives
+    just fall through to the exact lookup; deletions are handled by rebuild.
+    """
+
+    def __init__(self, bits: int = _BLOOM_BITS):
+        self.bits = bits
+        self.bitmap = 0
+
+    def add(self, token: str):
+        self.bitmap |= self._mask(token)
+
+    def might_contain(self, token: str) -> bool:
+        mask = self._mask(token)
+        return (self.bitmap & mask) == mask
+
+    def rebuild(self, tokens):
+        self.bitmap = 0
+        for token in tokens:
+            self.add(token)
+
+    def _mask(self, token: str) -> int:
+        # Two bit positions derived from one hash call
+        h = hash(token)
+        return (1 << (h % self.bits)) | (1 << ((h >> 17) % self.bits))
+
+
+class _PreparedConnection(asyncpg.Connection):
+    """Connection subclass that can carry prepared statements as attributes."""
+
+
+async def _init_connection(conn):
+    """Register codecs and prepare the hot-path statements.
+
+    Runs as the pool's init hook, which receives the raw
+    _PreparedConnection exactly once per connection — the per-acquire
+    setup hook only ever sees the pool's __slots__ proxy, which can
+    neither carry the statement attributes nor should re-prepare on
+    every acquire.
+    """
+    await conn.set_type_codec(
+        'jsonb',
+        encoder=_json_encode,
+        decoder=_json_decode,
+        schema='pg_catalog',
+        format='text'
+    )
+    conn.stmt_insert_memory = await conn.prepare(SQL_INSERT_MEMORY)
+    conn.stmt_update_access = await conn.prepare(SQL_UPDATE_ACCESS)
+    conn.stmt_delete_by_id = await conn.prepare(SQL_DELETE_BY_ID)
+    conn.stmt_delete_older_than = await conn.prepare(SQL_DELETE_OLDER_THAN)
 
 
 class MemoryStorage:
@@ -31,9 +140,27 @@ class MemoryStorage:
     """
 
     def __init__(self):
-        self.short_term_memory = []  # List of recent memories for quick access
+        # Recent memories for quick access, keyed by memory id in LRU order
+        # (oldest first). OrderedDict gives O(1) insert/evict/touch instead of
+        # the O(n) shifts and copies a plain list would need.
+        self.short_term_memory = OrderedDict()
         self.db_pool = None  # PostgreSQL connection pool
         self.is_initialized = False
+        self._access_buffer = set()  # Memory ids awaiting an access-count flush
+        self._flush_task = None  # Background task draining _access_buffer
+        # Inverted indexes over short-term memory: token/tag -> memory ids,
+        # so recall intersects posting sets instead of scanning every entry
+        self._token_index = defaultdict(set)
+        self._tag_index = defaultdict(set)
+        # Numeric scoring fields live in a preallocated structured array so
+        # recall reads contiguous memory instead of chasing per-dict refs;
+        # each short-term memory owns one slot for its lifetime
+        self._st_stats = np.zeros(DEFAULT_SHORT_TERM_CAPACITY, dtype=_ST_STATS_DTYPE)
+        self._free_slots = list(range(DEFAULT_SHORT_TERM_CAPACITY - 1, -1, -1))
+        # Bloom filter rejecting short-term misses before any index lookup;
+        # rebuilt from the token index once enough evictions accumulate
+        self._st_bloom = _TokenBloom()
+        self._evictions_since_rebuild = 0
 
     async def initialize(self):
         """Initialize the memory storage, including database connection."""
@@ -41,40 +168,52 @@ class MemoryStorage:
             return
 
         try:
-            # Create PostgreSQL connection pool
-            self.db_pool = await asyncpg.create_pool(
-                user="postgres",
-                password="Bfoster15!",
-                database="postgres",
-                host="localhost",
-                port=5432
-            )
-
-            # Create tables if they don't exist
-            async with self.db_pool.acquire() as conn:
+            # Create the schema over a direct connection first, so the pool's
+            # init hook can prepare statements against existing tables
+            conn = await asyncpg.connect(**DB_SETTINGS)
+            try:
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS memories (
                         id SERIAL PRIMARY KEY,
                         content TEXT NOT NULL,
                         metadata JSONB,
+                        tags TEXT[] DEFAULT '{}',
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         access_count INTEGER DEFAULT 1
                     )
                 ''')
 
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS memory_tags (
-                        id SERIAL PRIMARY KEY,
-                        memory_id INTEGER REFERENCES memories(id) ON DELETE CASCADE,
-                        tag TEXT NOT NULL
-                    )
-                ''')
+                # Migrate installs created before tags were denormalized
+                await conn.execute('''ALTER TABLE memories
+                                      ADD COLUMN IF NOT EXISTS tags TEXT[] DEFAULT '{}' ''')
 
                 # Create indexes for faster querying
                 await conn.execute('CREATE INDEX IF NOT EXISTS idx_memories_last_accessed ON memories(last_accessed)')
-                await conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_tags_tag ON memory_tags(tag)')
-                await conn.execute('CREATE INDEX IF NOT EXISTS idx_memory_tags_memory_id ON memory_tags(memory_id)')
+                await conn.execute('CREATE INDEX IF NOT EXISTS idx_memories_created_at ON memories(created_at)')
+                # Full-text index backing content search in _search_long_term
+                await conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_content_fts
+                                      ON memories USING GIN (to_tsvector('simple', content))''')
+                # Composite index matching the top-N frequency/recency path
+                await conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_access_recency
+                                      ON memories(access_count DESC, last_accessed DESC)''')
+                # GIN index serving tag containment (tags && $1) filters
+                await conn.execute('''CREATE INDEX IF NOT EXISTS idx_memories_tags_gin
+                                      ON memories USING GIN (tags)''')
+            finally:
+                await conn.close()
+
+            # Create PostgreSQL connection pool; each new connection prepares
+            # the hot-path statements once so they are parsed/planned a single
+            # time per connection instead of per call
+            self.db_pool = await asyncpg.create_pool(
+                connection_class=_PreparedConnection,
+                init=_init_connection,
+                **DB_SETTINGS
+            )
+
+            # Drain buffered access updates off the recall critical path
+            self._flush_task = asyncio.create_task(self._flush_access_loop())
 
             self.is_initialized = True
             return ToolResult(output="Memory storage initialized successfully.")
@@ -98,8 +237,10 @@ class MemoryStorage:
             await self.initialize()
 
         try:
-            # Prepare memory object
-            timestamp = datetime.datetime.now()
+            # Prepare memory object; grab the epoch once and derive the
+            # datetime from it so the scoring slot needs no conversion
+            created_ts = time.time()
+            timestamp = datetime.datetime.fromtimestamp(created_ts)
             memory = {
                 "content": content,
                 "tags": tags or [],
@@ -109,27 +250,27 @@ class MemoryStorage:
                 "access_count": 1
             }
 
-            # Store in short-term memory (with capacity limit)
-            self.short_term_memory.append(memory)
-            if len(self.short_term_memory) > DEFAULT_SHORT_TERM_CAPACITY:
-                # Remove oldest memory if capacity exceeded
-                self.short_term_memory.pop(0)
-
-            # Store in long-term memory (PostgreSQL)
+            # Store in long-term memory (PostgreSQL); tags ride along in the
+            # denormalized array column, so one insert covers everything
             async with self.db_pool.acquire() as conn:
-                # Insert memory
-                memory_id = await conn.fetchval('''
-                    INSERT INTO memories (content, metadata, created_at, last_accessed, access_count)
-                    VALUES ($1, $2, $3, $4, $5)
-                    RETURNING id
-                ''', content, json.dumps(metadata or {}), timestamp, timestamp, 1)
-
-                # Insert tags
-                if tags:
-                    await conn.executemany('''
-                        INSERT INTO memory_tags (memory_id, tag)
-                        VALUES ($1, $2)
-                    ''', [(memory_id, tag) for tag in tags])
+                memory_id = await conn.stmt_insert_memory.fetchval(
+                    content, metadata or {}, tags or [], timestamp, timestamp, 1)
+
+            # Store in short-term memory (with capacity limit)
+            memory["id"] = memory_id
+            if len(self.short_term_memory) >= DEFAULT_SHORT_TERM_CAPACITY:
+                # Evict the least recently used memory first; unindexing it
+                # frees the slot the new memory is about to claim
+                evicted_id, evicted = self.short_term_memory.popitem(last=False)
+                self._unindex_short_term(evicted_id, evicted)
+            memory["slot"] = self._free_slots.pop()
+            self._st_stats[memory["slot"]] = (created_ts, 1)
+            self.short_term_memory[memory_id] = memory
+            for token in set(_TOKEN_RE.findall(content.lower())):
+                self._token_index[token].add(memory_id)
+                self._st_bloom.add(token)
+            for tag in memory["tags"]:
+                self._tag_index[tag].add(memory_id)
 
             return ToolResult(output=f"Memory stored successfully with {len(tags or [])} tags.")
 
@@ -158,7 +299,7 @@ class MemoryStorage:
             results = []
 
             # First, check short-term memory
-            short_term_results = self._search_short_term(query, tags)
+            short_term_results = self._search_short_term(query, tags, limit)
 
             # If we found enough in short-term memory, just return those
             if len(short_term_results) >= limit:
@@ -172,15 +313,10 @@ class MemoryStorage:
             else:
                 results = short_term_results
 
-            # Update access counts and last_accessed timestamp for retrieved memories
-            memory_ids = [r.get("id") for r in results if r.get("id")]
-            if memory_ids and self.db_pool:
-                async with self.db_pool.acquire() as conn:
-                    await conn.execute('''
-                        UPDATE memories 
-                        SET access_count = access_count + 1, last_accessed = CURRENT_TIMESTAMP
-                        WHERE id = ANY($1)
-                    ''', memory_ids)
+            # Buffer access-count updates; the background flusher batches them
+            # into one UPDATE instead of paying a write round-trip per recall
+            self._access_buffer.update(
+                r["id"] for r in results if r.get("id"))
 
             if not results:
                 return ToolResult(output="No memories found matching the criteria.")
@@ -200,40 +336,145 @@ class MemoryStorage:
         except Exception as e:
             return ToolResult(error=f"Failed to recall memories: {str(e)}")
 
-    def _search_short_term(self, query: str = None, tags: List[str] = None) -> List[Dict]:
+    async def _flush_access_loop(self):
+        """Periodically flush buffered access updates in a single batched UPDATE."""
+        while True:
+            await asyncio.sleep(ACCESS_FLUSH_INTERVAL)
+            try:
+                await self._flush_access_buffer()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error flushing memory access updates: {e}")
+
+    async def _flush_access_buffer(self):
+        """Write any buffered access counts/timestamps to the database."""
+        if not self._access_buffer or not self.db_pool:
+            return
+
+        memory_ids = list(self._access_buffer)
+        self._access_buffer.clear()
+
+        # Cap the ids per statement so a recall spike cannot turn into one
+        # giant UPDATE holding row locks and writing a huge WAL record
+        for start in range(0, len(memory_ids), ACCESS_FLUSH_CHUNK):
+            chunk = memory_ids[start:start + ACCESS_FLUSH_CHUNK]
+            async with self.db_pool.acquire() as conn:
+                await conn.stmt_update_access.fetch(chunk)
+
+    async def close(self):
+        """Flush pending access updates and shut down the storage backend."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._flush_access_buffer()
+        if self.db_pool:
+            await self.db_pool.close()
+            self.db_pool = None
+        self.is_initialized = False
+
+    def _unindex_short_term(self, memory_id: int, memory: Dict):
+        """Release a removed short-term memory's slot and index entries."""
+        self._free_slots.append(memory["slot"])
+        for token in set(_TOKEN_RE.findall(memory["content"].lower())):
+            postings = self._token_index.get(token)
+            if postings is not None:
+                postings.discard(memory_id)
+                if not postings:
+                    del self._token_index[token]
+        for tag in memory.get("tags", []):
+            postings = self._tag_index.get(tag)
+            if postings is not None:
+                postings.discard(memory_id)
+                if not postings:
+                    del self._tag_index[tag]
+
+        # The bloom filter cannot delete; refresh it from the surviving
+        # tokens once a capacity's worth of removals has built up
+        self._evictions_since_rebuild += 1
+        if self._evictions_since_rebuild >= DEFAULT_SHORT_TERM_CAPACITY:
+            self._st_bloom.rebuild(self._token_index)
+            self._evictions_since_rebuild = 0
+
+    def _search_short_term(self, query: str = None, tags: List[str] = None,
+                           limit: int = None) -> List[Dict]:
         """Search for memories in short-term memory."""
         if not self.short_term_memory:
             return []
 
-        results = self.short_term_memory.copy()
+        query_lower = query.lower() if query else None
+
+        # Narrow to candidates by intersecting inverted-index posting sets
+        # instead of scanning every short-term entry
+        candidate_ids = None
+        if query_lower:
+            query_tokens = set(_TOKEN_RE.findall(query_lower))
+
+            # O(1) rejection: a token missing from the bloom filter cannot
+            # be present in any short-term memory
+            if any(not self._st_bloom.might_contain(token)
+                   for token in query_tokens):
+                return []
+
+            for token in query_tokens:
+                postings = self._token_index.get(token)
+                if not postings:
+                    return []
+                candidate_ids = set(postings) if candidate_ids is None \
+                    else candidate_ids & postings
+        if tags:
+            tag_hits = set()
+            for tag in tags:
+                tag_hits |= self._tag_index.get(tag, set())
+            candidate_ids = tag_hits if candidate_ids is None \
+                else candidate_ids & tag_hits
+
+        if candidate_ids is None:
+            # Reached with no query at all, or one with no \w+ tokens
+            # (punctuation- or emoji-only): keep the substring filter so
+            # a token-less query can't match every memory
+            candidates = [m for m in self.short_term_memory.values()
+                          if not query_lower
+                          or query_lower in m["content"].lower()]
+        else:
+            # Confirm the full phrase on the (small) candidate set so
+            # multi-word queries keep their substring semantics
+            candidates = [self.short_term_memory[mid] for mid in candidate_ids
+                          if not query_lower
+                          or query_lower in self.short_term_memory[mid]["content"].lower()]
 
-        # Filter by query if provided
-        if query:
-            results = [m for m in results if query.lower()
-                       in m["content"].lower()]
+        if not candidates:
+            return []
+
+        # Score all candidates in one vectorized pass:
+        # recency (newer is better) weighted against frequency (capped at 1.0)
+        now_ts = time.time()
+        n = len(candidates)
+        slots = np.fromiter((m["slot"] for m in candidates),
+                            dtype=np.intp, count=n)
+        stats = self._st_stats[slots]
+        age_hours = (now_ts - stats['created']) / 3600.0
+        scores = (RECENCY_WEIGHT / (1.0 + age_hours / SHORT_TERM_DECAY_HOURS)) + \
+            (FREQUENCY_WEIGHT * np.minimum(stats['access'] / 10.0, 1.0))
+
+        # Top-k selection: argpartition is O(n), a full sort only over the top k
+        if limit is not None and limit < n:
+            top = np.argpartition(-scores, limit)[:limit]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores)
+
+        results = []
+        for idx in order:
+            memory = candidates[idx]
+            memory["score"] = float(scores[idx])
+            results.append(memory)
+
+        # Mark hits as recently used (after the loop so iteration order is stable)
+        for memory in results:
+            self.short_term_memory.move_to_end(memory["id"])
+            self._st_stats['access'][memory["slot"]] += 1
 
-        # Filter by tags if provided
-        if tags:
-            results = [m for m in results if any(
-                tag in m.get("tags", []) for tag in tags)]
-
-        # Calculate memory importance based on recency and frequency
-        now = datetime.datetime.now()
-        for result in results:
-            # Calculate recency score (newer is better)
-            age_hours = (now - result["created_at"]).total_seconds() / 3600
-            recency_score = 1.0 / (1.0 + age_hours / SHORT_TERM_DECAY_HOURS)
-
-            # Calculate frequency score
-            frequency_score = min(
-                result["access_count"] / 10.0, 1.0)  # Cap at 1.0
-
-            # Combined score
-            result["score"] = (RECENCY_WEIGHT * recency_score) + \
-                (FREQUENCY_WEIGHT * frequency_score)
-
-        # Sort by score (highest first)
-        results.sort(key=lambda x: x["score"], reverse=True)
         return results
 
     async def _search_long_term(self, query: str = None, tags: List[str] = None, limit: int = 5) -> List[Dict]:
@@ -243,45 +484,58 @@ class MemoryStorage:
 
         try:
             async with self.db_pool.acquire() as conn:
-                base_query = '''
-                    SELECT m.id, m.content, m.metadata, m.created_at, m.last_accessed, m.access_count,
-                           array_agg(mt.tag) as tags,
-                           (
-                               -- Calculate recency score
-                               $1 * (1.0 / (1.0 + EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - m.last_accessed))/86400/$3)) +
-                               -- Calculate frequency score
-                               $2 * LEAST(m.access_count / 10.0, 1.0)
-                           ) as score
-                    FROM memories m
-                    LEFT JOIN memory_tags mt ON m.id = mt.memory_id
-                '''
-
                 params = [RECENCY_WEIGHT, FREQUENCY_WEIGHT,
                           MEMORY_HALF_LIFE_DAYS]
                 where_clauses = []
+                rank_term = ""
 
-                # Add content search if query provided
+                # Add full-text content search if query provided; the GIN index
+                # on to_tsvector makes this an index lookup instead of a scan
                 if query:
+                    params.append(query)
+                    query_param = "$" + str(len(params))
                     where_clauses.append(
-                        "m.content ILIKE $" + str(len(params) + 1))
-                    params.append(f"%{query}%")
+                        "to_tsvector('simple', m.content) @@ plainto_tsquery('simple', " + query_param + ")")
+                    rank_term = (" + ts_rank_cd(to_tsvector('simple', m.content), "
+                                 "plainto_tsquery('simple', " + query_param + "))")
 
-                # Add tag filtering if tags provided
+                # Add tag filtering if tags provided; array overlap against
+                # the GIN-indexed tags column, no join needed
                 if tags:
                     where_clauses.append(
-                        "mt.tag = ANY($" + str(len(params) + 1) + ")")
+                        "m.tags && $" + str(len(params) + 1))
                     params.append(tags)
 
-                # Complete the query
+                where_sql = ""
                 if where_clauses:
-                    base_query += " WHERE " + " AND ".join(where_clauses)
+                    where_sql = " WHERE " + " AND ".join(where_clauses)
+
+                # Order and limit. Without a rank term the score ordering
+                # follows access_count/last_accessed, so order by those
+                # columns directly and let the composite index serve the
+                # top-N with an early stop instead of a full sort
+                if query:
+                    order_clause = "ORDER BY score DESC"
+                else:
+                    order_clause = "ORDER BY m.access_count DESC, m.last_accessed DESC"
 
-                # Group by, order by score, and limit
-                base_query += '''
-                    GROUP BY m.id, m.content, m.metadata, m.created_at, m.last_accessed, m.access_count
-                    ORDER BY score DESC
-                    LIMIT $''' + str(len(params) + 1)
                 params.append(limit)
+                limit_param = "$" + str(len(params))
+
+                # Tags come straight off the row now, so the whole recall is
+                # a single scan over memories with no tag join at all
+                base_query = '''
+                    SELECT m.id, m.content, m.metadata, m.tags, m.created_at, m.last_accessed, m.access_count,
+                           (
+                               -- Calculate recency score
+                               $1 * (1.0 / (1.0 + EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - m.last_accessed))/86400/$3)) +
+                               -- Calculate frequency score
+                               $2 * LEAST(m.access_count / 10.0, 1.0)''' + rank_term + '''
+                           ) as score
+                    FROM memories m''' + where_sql + '''
+                    ''' + order_clause + '''
+                    LIMIT ''' + limit_param + '''
+                '''
 
                 # Execute query
                 rows = await conn.fetch(base_query, *params)
@@ -292,7 +546,7 @@ class MemoryStorage:
                         "id": row["id"],
                         "content": row["content"],
                         "tags": row["tags"] or [],
-                        "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
+                        "metadata": row["metadata"] or {},
                         "created_at": row["created_at"],
                         "last_accessed": row["last_accessed"],
                         "access_count": row["access_count"],
@@ -325,30 +579,32 @@ class MemoryStorage:
             # Handle forgetting by ID
             if memory_id:
                 # Remove from short-term memory
-                self.short_term_memory = [
-                    m for m in self.short_term_memory if m.get("id") != memory_id]
+                removed = self.short_term_memory.pop(memory_id, None)
+                if removed:
+                    self._unindex_short_term(memory_id, removed)
 
                 # Remove from long-term memory
                 async with self.db_pool.acquire() as conn:
-                    result = await conn.execute('DELETE FROM memories WHERE id = $1', memory_id)
+                    await conn.stmt_delete_by_id.fetch(memory_id)
                     # Parse count from DELETE X
-                    count = int(result.split()[-1])
+                    count = int(conn.stmt_delete_by_id.get_statusmsg().split()[-1])
 
             # Handle forgetting by age
             elif older_than_days:
                 cutoff_date = datetime.datetime.now() - datetime.timedelta(days=older_than_days)
 
                 # Remove from short-term memory
-                old_count = len(self.short_term_memory)
-                self.short_term_memory = [
-                    m for m in self.short_term_memory if m["created_at"] > cutoff_date]
-                count += old_count - len(self.short_term_memory)
+                expired = [mid for mid, m in self.short_term_memory.items()
+                           if m["created_at"] <= cutoff_date]
+                for mid in expired:
+                    self._unindex_short_term(mid, self.short_term_memory.pop(mid))
+                count += len(expired)
 
                 # Remove from long-term memory
                 async with self.db_pool.acquire() as conn:
-                    result = await conn.execute('DELETE FROM memories WHERE created_at < $1', cutoff_date)
+                    await conn.stmt_delete_older_than.fetch(cutoff_date)
                     # Parse count from DELETE X
-                    count += int(result.split()[-1])
+                    count += int(conn.stmt_delete_older_than.get_statusmsg().split()[-1])
 
             return ToolResult(output=f"Forgot {count} memories.")
 
@@ -371,44 +627,49 @@ class MemoryStorage:
 
         try:
             async with self.db_pool.acquire() as conn:
-                base_query = '''
-                    SELECT COUNT(*) as total_count,
-                           MIN(created_at) as earliest,
-                           MAX(created_at) as latest,
-                           array_agg(DISTINCT tag) as all_tags
-                    FROM memories m
-                    LEFT JOIN memory_tags mt ON m.id = mt.memory_id
-                    WHERE created_at > CURRENT_TIMESTAMP - INTERVAL '$1 days'
-                '''
-
                 params = [days]
+                tag_filter = ""
 
                 if tags:
-                    base_query += " AND tag = ANY($2)"
+                    tag_filter = " AND m.tags && $2"
                     params.append(tags)
 
-                row = await conn.fetchrow(base_query, *params)
-
-                if row["total_count"] == 0:
-                    return ToolResult(output=f"No memories found in the past {days} days.")
-
-                # Get most frequent tags
-                tag_query = '''
-                    SELECT tag, COUNT(*) as tag_count
-                    FROM memory_tags mt
-                    JOIN memories m ON mt.memory_id = m.id
-                    WHERE m.created_at > CURRENT_TIMESTAMP - INTERVAL '$1 days'
-                    GROUP BY tag
-                    ORDER BY tag_count DESC
-                    LIMIT 5
+                # One round-trip: scope the memories once, then derive both the
+                # aggregate row and the top tags from that CTE
+                summary_query = '''
+                    WITH scoped AS (
+                        SELECT m.id, m.created_at, m.tags
+                        FROM memories m
+                        WHERE m.created_at > CURRENT_TIMESTAMP - ($1 * INTERVAL '1 day')''' + tag_filter + '''
+                    ),
+                    agg AS (
+                        SELECT COUNT(*) AS total_count,
+                               MIN(created_at) AS earliest,
+                               MAX(created_at) AS latest
+                        FROM scoped
+                    ),
+                    top_tags AS (
+                        SELECT tag, COUNT(*) AS tag_count
+                        FROM scoped, unnest(scoped.tags) AS tag
+                        GROUP BY tag
+                        ORDER BY tag_count DESC
+                        LIMIT 5
+                    )
+                    SELECT (SELECT row_to_json(agg) FROM agg) AS summary,
+                           (SELECT json_agg(top_tags) FROM top_tags) AS tags
                 '''
 
-                top_tags = await conn.fetch(tag_query, days)
+                row = await conn.fetchrow(summary_query, *params)
+                stats = _json_decode(row["summary"]) if row["summary"] else {}
+                top_tags = _json_decode(row["tags"]) if row["tags"] else []
+
+                if not stats.get("total_count"):
+                    return ToolResult(output=f"No memories found in the past {days} days.")
 
-                # Format summary
+                # Format summary (timestamps arrive as ISO strings via row_to_json)
                 summary = f"Memory Summary (past {days} days):\n\n"
-                summary += f"Total memories: {row['total_count']}\n"
-                summary += f"Time span: {row['earliest'].strftime('%Y-%m-%d')} to {row['latest'].strftime('%Y-%m-%d')}\n"
+                summary += f"Total memories: {stats['total_count']}\n"
+                summary += f"Time span: {stats['earliest'][:10]} to {stats['latest'][:10]}\n"
 
                 if top_tags:
                     summary += "\nTop tags:\n"
@@ -431,6 +692,14 @@ class MemoryTool(BaseAnthropicTool):
     name: ClassVar[Literal["memory"]] = "memory"
     api_type: ClassVar[Literal["function"]] = "function"
 
+    # Dispatch table: action -> (MemoryStorage coroutine, forwarded arguments)
+    _HANDLERS: ClassVar[Dict[str, tuple]] = {
+        "store": ("store", ("content", "tags")),
+        "recall": ("recall", ("query", "tags", "limit", "use_long_term")),
+        "forget": ("forget", ("memory_id", "older_than_days")),
+        "summarize": ("summarize", ("tags", "days")),
+    }
+
     async def __call__(self, action: str, content: str = None, query: str = None,
                        tags: List[str] = None, memory_id: int = None,
                        older_than_days: int = None, days: int = 30,
@@ -455,77 +724,81 @@ class MemoryTool(BaseAnthropicTool):
         if not _memory_storage.is_initialized:
             await _memory_storage.initialize()
 
-        # Execute the requested action
-        if action == "store" and content:
-            return await _memory_storage.store(content, tags)
-
-        elif action == "recall":
-            return await _memory_storage.recall(query, tags, limit, use_long_term)
-
-        elif action == "forget":
-            return await _memory_storage.forget(memory_id, older_than_days)
-
-        elif action == "summarize":
-            return await _memory_storage.summarize(tags, days)
-
-        else:
+        # Execute the requested action via the dispatch table
+        handler = self._HANDLERS.get(action)
+        if handler is None:
             return ToolResult(error=f"Invalid memory action: {action}. Valid actions are: store, recall, forget, summarize")
 
-    def to_params(self) -> BetaToolUnionParam:
-        return {
-            "type": self.api_type,
-            "name": self.name,
-            "function": {
-                "name": self.name,
-                "description": "Store and recall memories with human-like memory characteristics including decay, using both short-term and long-term memory storage.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "action": {
-                            "type": "string",
-                            "enum": ["store", "recall", "forget", "summarize"],
-                            "description": "The memory operation to perform"
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "Content to store in memory (for 'store' action)"
-                        },
-                        "query": {
-                            "type": "string",
-                            "description": "Text to search for in memories (for 'recall' action)"
-                        },
-                        "tags": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            },
-                            "description": "Tags/keywords for categorizing or filtering memories"
-                        },
-                        "memory_id": {
-                            "type": "integer",
-                            "description": "ID of a specific memory to forget (for 'forget' action)"
-                        },
-                        "older_than_days": {
-                            "type": "integer",
-                            "description": "Forget memories older than this many days (for 'forget' action)"
-                        },
-                        "days": {
-                            "type": "integer",
-                            "description": "Number of days to look back (for 'summarize' action)",
-                            "default": 30
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of memories to return (for 'recall' action)",
-                            "default": 5
+        if action == "store" and not content:
+            return ToolResult(error="Memory action 'store' requires content.")
+
+        provided = {"content": content, "query": query, "tags": tags,
+                    "memory_id": memory_id, "older_than_days": older_than_days,
+                    "days": days, "limit": limit, "use_long_term": use_long_term}
+
+        method_name, arg_names = handler
+        method = getattr(_memory_storage, method_name)
+        return await method(**{arg: provided[arg] for arg in arg_names})
+
+    # Static schema, built once at class definition; to_params() returns the
+    # shared dict instead of reallocating it on every call
+    _PARAMS: ClassVar[BetaToolUnionParam] = {
+        "type": api_type,
+        "name": name,
+        "function": {
+            "name": name,
+            "description": "Store and recall memories with human-like memory characteristics including decay, using both short-term and long-term memory storage.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "action": {
+                        "type": "string",
+                        "enum": ["store", "recall", "forget", "summarize"],
+                        "description": "The memory operation to perform"
+                    },
+                    "content": {
+                        "type": "string",
+                        "description": "Content to store in memory (for 'store' action)"
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "Text to search for in memories (for 'recall' action)"
+                    },
+                    "tags": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
                         },
-                        "use_long_term": {
-                            "type": "boolean",
-                            "description": "Whether to check long-term memory if not found in short-term (for 'recall' action)",
-                            "default": True
-                        }
+                        "description": "Tags/keywords for categorizing or filtering memories"
                     },
-                    "required": ["action"],
+                    "memory_id": {
+                        "type": "integer",
+                        "description": "ID of a specific memory to forget (for 'forget' action)"
+                    },
+                    "older_than_days": {
+                        "type": "integer",
+                        "description": "Forget memories older than this many days (for 'forget' action)"
+                    },
+                    "days": {
+                        "type": "integer",
+                        "description": "Number of days to look back (for 'summarize' action)",
+                        "default": 30
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of memories to return (for 'recall' action)",
+                        "default": 5
+                    },
+                    "use_long_term": {
+                        "type": "boolean",
+                        "description": "Whether to check long-term memory if not found in short-term (for 'recall' action)",
+                        "default": True
+                    }
                 },
+                "required": ["action"],
             },
-        }
+        },
+    }
+
+    def to_params(self) -> BetaToolUnionParam:
+        return self._PARAMS
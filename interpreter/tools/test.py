@@ -30,27 +30,31 @@ class TestTool(BaseAnthropicTool):
         else:
             return ToolResult(output=f"Unknown function: {function_name}")
 
-    def to_params(self) -> BetaToolUnionParam:
-        return {
-            "type": self.api_type,
-            "name": self.name,
-            "function": {
-                "name": self.name,
-                "description": "A test tool with three different functions: test1 outputs 'hello world', test2 outputs a personalized greeting, and test3 outputs 'goodbye'",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "function_name": {
-                            "type": "string",
-                            "enum": ["test1", "test2", "test3"],
-                            "description": "The test function to execute"
-                        },
-                        "user_name": {
-                            "type": "string",
-                            "description": "Optional user name for test2 function"
-                        }
+    # Static schema, built once at class definition; to_params() returns the
+    # shared dict instead of reallocating it on every call
+    _PARAMS: ClassVar[BetaToolUnionParam] = {
+        "type": api_type,
+        "name": name,
+        "function": {
+            "name": name,
+            "description": "A test tool with three different functions: test1 outputs 'hello world', test2 outputs a personalized greeting, and test3 outputs 'goodbye'",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "function_name": {
+                        "type": "string",
+                        "enum": ["test1", "test2", "test3"],
+                        "description": "The test function to execute"
                     },
-                    "required": ["function_name"],
+                    "user_name": {
+                        "type": "string",
+                        "description": "Optional user name for test2 function"
+                    }
                 },
+                "required": ["function_name"],
             },
-        }
+        },
+    }
+
+    def to_params(self) -> BetaToolUnionParam:
+        return self._PARAMS
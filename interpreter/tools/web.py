@@ -0,0 +1,1182 @@
+"""
+Web Tool for Open Interpreter.
+This tool allows the agent to fetch web pages in a headless browser and read
+their visible text content.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, ClassVar, Dict, List, Literal, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from anthropic.types.beta import BetaToolUnionParam
+from playwright.async_api import Browser, Playwright
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
+
+from .base import BaseAnthropicTool, ToolError, ToolResult
+
+# Prefer orjson for format="json" output when available; same optional
+# speedup memory.py takes for metadata serialization
+try:
+    import orjson
+
+    def _json_encode(value):
+        return orjson.dumps(value).decode()
+except ImportError:
+    _json_encode = json.dumps
+
+# selectolax (lexbor) parses static HTML without a browser; optional, the
+# tool just keeps everything on the Playwright path when it is missing
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# BeautifulSoup is the slow-but-common fallback for structured extraction
+# when selectolax isn't installed; prefer its C-backed lxml parser over
+# the pure-Python html.parser when lxml is around
+try:
+    from bs4 import BeautifulSoup, Comment, NavigableString
+except ImportError:
+    BeautifulSoup = None
+    _BS4_PARSER = "html.parser"
+else:
+    try:
+        import lxml  # noqa: F401
+
+        _BS4_PARSER = "lxml"
+    except ImportError:
+        _BS4_PARSER = "html.parser"
+
+# Constants for web fetching
+DEFAULT_WAIT_TIME = 5  # Seconds to allow dynamic content to settle
+DEFAULT_BATCH_CONCURRENCY = 5  # Concurrent fetches per batch call
+BATCH_CHUNK_SIZE = 20  # URLs gathered at once; bounds in-flight tasks/results
+NAVIGATION_TIMEOUT_MS = 30000  # Hard cap on page navigation
+# Text extraction doesn't need a desktop-sized layout; a small viewport
+# cuts per-page layout and raster memory
+DEFAULT_VIEWPORT = {"width": 800, "height": 600}
+CACHE_MAX_ENTRIES = 256  # Cap on cached page contents
+CACHE_TTL_SECONDS = 300  # How long a cached page stays fresh
+STATIC_FETCH_TIMEOUT = 15  # Seconds for the plain-HTTP fast path
+STATIC_MAX_BYTES = 2 * 1024 * 1024  # Pages bigger than this go to the browser
+DEFAULT_MAX_TEXT_CHARS = 200_000  # Cap on extracted text shipped to the model
+# Resource types that never contribute to extracted text; aborting them
+# saves most of a page's bandwidth and render time
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+CONTEXT_POOL_MAX = 4  # Warm browser contexts kept alive across calls
+PAGE_POOL_SIZE = 8  # Hard cap on live pages per context
+GOTO_MAX_ATTEMPTS = 3  # Navigation attempts before a fetch fails
+RETRY_BASE_DELAY = 1.0  # Seconds; doubled per attempt before jitter
+RETRY_MAX_DELAY = 30  # Cap on any single backoff sleep
+# Failures no amount of retrying will fix: bad DNS, refused or aborted
+# connections, unsupported schemes
+_UNRECOVERABLE_ERR_RE = re.compile(
+    r"ERR_NAME_NOT_RESOLVED|ERR_ABORTED|ERR_UNKNOWN_URL_SCHEME|"
+    r"ERR_CONNECTION_REFUSED|ERR_BLOCKED_BY_CLIENT")
+PER_HOST_CONCURRENCY = 2  # Simultaneous fetches allowed against one host
+CHALLENGE_WAIT_SECONDS = 20  # How long a detected challenge may take to clear
+# Launch flags that strip work text extraction never benefits from:
+# image decoding, GPU rasterization, per-site renderer processes, audio,
+# background services and an oversized V8 heap
+CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-audio-output",
+    "--mute-audio",
+    "--disable-background-networking",
+    "--disable-breakpad",
+    "--disable-component-update",
+    "--disable-domain-reliability",
+    "--disable-features=IsolateOrigins,site-per-process,"
+    "AudioServiceOutOfProcess,Translate,MediaRouter",
+    "--js-flags=--max-old-space-size=256",
+]
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+# Blank-line runs left behind by page layout; [ \t] rather than \s so a
+# run of newlines isn't collapsed across unrelated whitespace. The run
+# quantifier makes one pass collapse any length of run — without it the
+# closing newline of a match can't open the next one, so "\n\n\n"
+# survives a single sub
+_MULTI_NEWLINE = re.compile(r'\n(?:[ \t]*\n)+')
+
+# Challenge-page fingerprints, built once: the selector list and marker
+# regex used to be rebuilt on every detection call
+_TURNSTILE_SELECTORS = (
+    'iframe[src*="challenges.cloudflare.com"]',
+    'iframe[src*="turnstile"]',
+    '.cf-turnstile',
+    '#challenge-form',
+    '#challenge-running',
+    '#cf-challenge-running',
+    'div[class*="challenge-container"]',
+)
+_CHALLENGE_RE = re.compile(
+    r"verify you are human|checking your browser|just a moment|"
+    r"enable javascript and cookies|security check|ddos protection",
+    re.IGNORECASE)
+# One probe script, composed once from the selector list
+_CHALLENGE_PROBE_JS = """
+() => {
+    const selectors = %s;
+    return {
+        hit: selectors.some(s => !!document.querySelector(s)),
+        text: document.title + ' ' + (document.body
+            ? document.body.innerText.slice(0, 4096)
+            : ''),
+    };
+}
+""" % json.dumps(list(_TURNSTILE_SELECTORS))
+# Inverse predicate for waiting a challenge out, polled inside the browser
+_CHALLENGE_GONE_JS = """
+() => !document.querySelector(%s)
+    && !/%s/i.test(document.body
+        ? document.body.innerText.slice(0, 4096)
+        : '')
+""" % (json.dumps(", ".join(_TURNSTILE_SELECTORS)), _CHALLENGE_RE.pattern)
+# Markers a challenge page leaves in raw HTML; a static response carrying
+# any of them needs the browser path, which can actually run the challenge
+_TURNSTILE_RE = re.compile(
+    r"cf-turnstile|challenge-platform|__cf_chl|"
+    r"<noscript>[^<]*enable javascript",
+    re.IGNORECASE)
+
+# Analytics and ad-tech hosts whose requests only delay networkidle;
+# blocking them never changes the extracted content
+_TRACKER_RE = re.compile(
+    r"//[^/]*(?:"
+    r"doubleclick\.net|googletagmanager\.com|google-analytics\.com|"
+    r"googlesyndication\.com|connect\.facebook\.net|hotjar\.com|"
+    r"scorecardresearch\.com|adsystem\.com|criteo\.(?:com|net)"
+    r")/")
+
+# Masks the headless fingerprints that most commonly trigger challenge
+# pages. Registered once per context — every page and frame inherits it —
+# rather than re-serialized over CDP for each new page
+_STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+Object.defineProperty(navigator, 'plugins', {
+    get: () => [{ name: 'Chromium PDF Viewer' }]
+});
+window.chrome = window.chrome || { runtime: {} };
+"""
+
+# Cleaned content keyed by (url, *output options) in LRU order; agent
+# workflows revisit the same pages, and a hit skips Chromium entirely
+_content_cache = OrderedDict()
+
+
+def _dedupe_refs(pairs, base_url: str = ""):
+    """
+    Deduplicate (label, url) pairs by url in one ordered pass, resolving
+    relative urls against the page's own url first. A dict keyed by the
+    resolved url keeps first-seen order and first-seen label, without the
+    O(N^2) scans or double allocation of list(set(...)).
+    """
+    seen: Dict[str, str] = {}
+    for label, target in pairs:
+        if not target:
+            continue
+        if base_url:
+            target = urljoin(base_url, target)
+        if target not in seen:
+            seen[target] = label
+    return [(label, target) for target, label in seen.items()]
+
+
+def _extract_structured(html: str, extract_links: bool = False,
+                        extract_images: bool = False,
+                        max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                        base_url: str = ""
+                        ) -> Optional[Dict[str, Any]]:
+    """
+    Parse HTML into a title, visible text, and optional link and image
+    lists. Prefers selectolax's native parser (roughly an order of
+    magnitude faster than bs4 on large pages), falls back to
+    BeautifulSoup, and returns None when neither is installed.
+    max_text_chars bounds the text; 0 skips the text pass entirely for
+    links/images-only extraction. Links and images are deduplicated and,
+    when base_url is given, resolved to absolute urls.
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node else ""
+
+        links = []
+        if extract_links:
+            links = _dedupe_refs(
+                ((node.text(strip=True), node.attributes.get("href") or "")
+                 for node in tree.css("a[href]")), base_url)
+        images = []
+        if extract_images:
+            images = _dedupe_refs(
+                ((node.attributes.get("alt") or "",
+                  node.attributes.get("src") or "")
+                 for node in tree.css("img[src]")), base_url)
+
+        text = ""
+        body = tree.body
+        if max_text_chars and body is not None:
+            for node in body.css("script,style,noscript"):
+                node.decompose()
+            text = body.text(separator="\n")[:max_text_chars]
+        return {"title": title, "text": text, "links": links, "images": images}
+
+    if BeautifulSoup is not None:
+        # One walk over the tree instead of a title lookup, a get_text
+        # pass and a find_all per extracted element — each of those is
+        # O(nodes) on its own
+        soup = BeautifulSoup(html, _BS4_PARSER)
+        title = ""
+        links = []
+        images = []
+        text_parts = []
+        text_chars = 0
+        invisible = {"script", "style", "noscript", "title"}
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                if isinstance(node, Comment):
+                    continue
+                if text_chars >= max_text_chars:
+                    continue
+                parent = node.parent.name if node.parent else ""
+                if parent not in invisible:
+                    chunk = node.strip()
+                    if chunk:
+                        text_parts.append(chunk)
+                        text_chars += len(chunk) + 1
+                continue
+            name = node.name
+            if name == "title" and not title:
+                title = node.get_text(strip=True)
+            elif name == "a" and extract_links and node.has_attr("href"):
+                links.append((node.get_text(strip=True), node["href"]))
+            elif name == "img" and extract_images and node.has_attr("src"):
+                images.append((node.get("alt") or "", node["src"]))
+        return {"title": title, "text": "\n".join(text_parts)[:max_text_chars],
+                "links": _dedupe_refs(links, base_url),
+                "images": _dedupe_refs(images, base_url)}
+
+    return None
+
+
+def _format_structured(data: Dict[str, Any]) -> str:
+    """Render an extraction dict as the tool's markdown-ish output."""
+    parts = []
+    if data["title"]:
+        parts.append(f"# {data['title']}")
+    text = _MULTI_NEWLINE.sub('\n\n', data["text"]).strip()
+    if text:
+        parts.append(text)
+    if data["links"]:
+        parts.append("## Links\n" + "\n".join(
+            f"- {text or '(no text)'}: {href}"
+            for text, href in data["links"]))
+    if data["images"]:
+        parts.append("## Images\n" + "\n".join(
+            f"- {alt or '(no alt)'}: {src}"
+            for alt, src in data["images"]))
+    return "\n\n".join(parts)
+
+
+# One semaphore per hostname keeps batch mode from hammering a single
+# site into throttling us with 429s, independent of the global cap
+_host_sems: Dict[str, asyncio.Semaphore] = {}
+
+
+def _host_sem(url: str) -> asyncio.Semaphore:
+    """Return the concurrency semaphore for a URL's host."""
+    host = urlparse(url).netloc
+    return _host_sems.setdefault(host, asyncio.Semaphore(PER_HOST_CONCURRENCY))
+
+
+def _cache_get(key):
+    """Return a fresh cached content string, or None."""
+    entry = _content_cache.get(key)
+    if entry is None:
+        return None
+    cached_at, content = entry
+    if time.monotonic() - cached_at > CACHE_TTL_SECONDS:
+        del _content_cache[key]
+        return None
+    _content_cache.move_to_end(key)
+    return content
+
+
+def _cache_put(key, content):
+    """Store content for a key, evicting the least recently used past the cap."""
+    _content_cache[key] = (time.monotonic(), content)
+    _content_cache.move_to_end(key)
+    if len(_content_cache) > CACHE_MAX_ENTRIES:
+        _content_cache.popitem(last=False)
+
+
+class _PagePool:
+    """
+    Bounded pool of reusable pages for one browser context. Pages are
+    created lazily up to the cap and handed back after each fetch, so batch
+    calls reuse frames and JS contexts instead of paying new_page()/close()
+    per URL, and an unbounded batch can't thrash CPU and RAM.
+    """
+
+    def __init__(self, context, size: int = PAGE_POOL_SIZE):
+        self._context = context
+        self._size = size
+        self._created = 0
+        self._queue = asyncio.Queue()
+
+    async def acquire(self):
+        """Return an idle page, creating one while under the cap."""
+        if self._queue.empty() and self._created < self._size:
+            self._created += 1
+            return await self._context.new_page()
+        return await self._queue.get()
+
+    async def release(self, page):
+        """Blank a page out and hand it back to the pool."""
+        if page.is_closed():
+            self._created -= 1
+            return
+        try:
+            await page.evaluate("() => { document.open(); document.close(); }")
+        except Exception:
+            # Page is wedged (e.g. crashed renderer); drop it and let a
+            # fresh one be created on the next acquire
+            await page.close()
+            self._created -= 1
+            return
+        await self._queue.put(page)
+
+
+class WebTool(BaseAnthropicTool):
+    """Tool for fetching web pages and extracting their text content."""
+
+    name: ClassVar[Literal["web"]] = "web"
+    api_type: ClassVar[Literal["function"]] = "function"
+
+    # One Playwright driver and browser are shared by every call so repeat
+    # fetches skip the ~1-2s Chromium cold start; pages are still created
+    # (and closed) per request for isolation. Declared with explicit types
+    # so "not launched yet" is always a None check, never a hasattr probe
+    _pw: ClassVar[Optional[Playwright]] = None
+    _browser: ClassVar[Optional[Browser]] = None
+    # Locks are created lazily on first use, like _browser and
+    # _http_client: on Python 3.9 an asyncio.Lock built at import time
+    # binds the then-default event loop, and a contended acquire inside
+    # asyncio.run later fails with "attached to a different loop"
+    _launch_lock: ClassVar[Optional[asyncio.Lock]] = None
+
+    # Warm (context, page pool) pairs keyed by (user_agent, viewport) in LRU
+    # order; creating a context per request costs noticeable setup time, so
+    # pages are drawn from the pool instead
+    _contexts: ClassVar[OrderedDict] = OrderedDict()
+    _ctx_lock: ClassVar[Optional[asyncio.Lock]] = None
+
+    # One keep-alive HTTP client backs every static fetch; per-call
+    # clients would pay a TCP+TLS handshake per page
+    _http_client: ClassVar[Optional[httpx.AsyncClient]] = None
+
+    def __init__(self):
+        super().__init__()
+        # Overlap the Chromium cold start with model think time so the
+        # first fetch finds a warm browser; _get_browser's lock makes the
+        # extra call idempotent. The task reference and done-callback keep
+        # a failed warm-up from dumping "Task exception was never
+        # retrieved" at GC time — the first real fetch surfaces the same
+        # error as a ToolResult
+        try:
+            self._warmup_task = asyncio.get_running_loop().create_task(
+                self._get_browser())
+            self._warmup_task.add_done_callback(
+                lambda task: task.exception() if not task.cancelled()
+                else None)
+        except RuntimeError:
+            self._warmup_task = None  # No running loop yet; the first call
+            # pays the launch
+
+    @classmethod
+    async def _get_browser(cls):
+        """Launch the shared headless browser on first use and reuse it after."""
+        if cls._launch_lock is None:
+            cls._launch_lock = asyncio.Lock()
+
+        # A crashed or disconnected browser invalidates every pooled
+        # context; drop the dead handles and relaunch on demand
+        if cls._browser is not None and not cls._browser.is_connected():
+            async with cls._launch_lock:
+                if cls._browser is not None and not cls._browser.is_connected():
+                    cls._contexts.clear()
+                    cls._browser = None
+
+        if cls._browser is None:
+            async with cls._launch_lock:
+                if cls._browser is None:
+                    # The driver survives a failed launch; reuse it on
+                    # retry instead of orphaning one node process per
+                    # attempt
+                    if cls._pw is None:
+                        cls._pw = await async_playwright().start()
+                    # A long-running browser server (e.g. a
+                    # `python -m playwright run-server` sidecar) lets every
+                    # interpreter process skip the Chromium cold start;
+                    # PLAYWRIGHT_CDP_ENDPOINT does the same for an existing
+                    # Chrome started with --remote-debugging-port
+                    ws_endpoint = os.environ.get("OI_PLAYWRIGHT_WS")
+                    cdp_endpoint = os.environ.get("PLAYWRIGHT_CDP_ENDPOINT")
+                    if ws_endpoint:
+                        cls._browser = await cls._pw.chromium.connect(ws_endpoint)
+                    elif cdp_endpoint:
+                        cls._browser = await cls._pw.chromium.connect_over_cdp(
+                            cdp_endpoint)
+                    else:
+                        cls._browser = await cls._pw.chromium.launch(
+                            headless=True, args=CHROMIUM_ARGS)
+        return cls._browser
+
+    @classmethod
+    async def _get_context(cls, user_agent: str = None,
+                           viewport: tuple = (800, 600)):
+        """Return a warm (context, page pool) pair, creating on miss."""
+        if cls._ctx_lock is None:
+            cls._ctx_lock = asyncio.Lock()
+        key = (user_agent, viewport)
+        async with cls._ctx_lock:
+            # Fetching the browser first lets a disconnect flush the pool
+            # before a stale entry is handed out
+            browser = await cls._get_browser()
+            entry = cls._contexts.get(key)
+            if entry is not None:
+                cls._contexts.move_to_end(key)
+                return entry
+
+            context = await browser.new_context(
+                viewport={"width": viewport[0], "height": viewport[1]},
+                user_agent=user_agent)
+            await context.add_init_script(_STEALTH_JS)
+            await context.route("**/*", cls._route_request)
+            entry = (context, _PagePool(context))
+            cls._contexts[key] = entry
+            if len(cls._contexts) > CONTEXT_POOL_MAX:
+                _, (stale, _pool) = cls._contexts.popitem(last=False)
+                await stale.close()
+            return entry
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        """Return the shared keep-alive HTTP client, creating it lazily."""
+        if cls._http_client is None:
+            cls._http_client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=STATIC_FETCH_TIMEOUT,
+                headers={"User-Agent": USER_AGENT,
+                         "Accept": "text/html,application/xhtml+xml"},
+                limits=httpx.Limits(max_connections=100,
+                                    max_keepalive_connections=20))
+        return cls._http_client
+
+    async def __aenter__(self):
+        """Enter scoped use of the tool, warming the shared browser."""
+        await self._get_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Tear the shared browser and HTTP client down on scope exit."""
+        await self.shutdown()
+        return False
+
+    @classmethod
+    async def shutdown(cls):
+        """Close the shared browser and stop the Playwright driver.
+
+        The HTTP client and every pooled context close concurrently —
+        each close is a network round trip, so sequential awaits would
+        make teardown linear in the pool size. Failures are swallowed;
+        a context whose pages already died must not keep the browser
+        process alive.
+        """
+        closers = []
+        if cls._http_client is not None:
+            closers.append(cls._http_client.aclose())
+            cls._http_client = None
+        while cls._contexts:
+            _, (context, _pool) = cls._contexts.popitem(last=False)
+            closers.append(context.close())
+        if closers:
+            await asyncio.gather(*closers, return_exceptions=True)
+        if cls._browser is not None:
+            await cls._browser.close()
+            cls._browser = None
+        if cls._pw is not None:
+            await cls._pw.stop()
+            cls._pw = None
+
+    async def __call__(self, url: str = None, urls: List[str] = None,
+                       selector: str = None, javascript: str = None,
+                       wait_time: float = DEFAULT_WAIT_TIME,
+                       force_refresh: bool = False,
+                       extract_links: bool = False,
+                       extract_images: bool = False,
+                       scroll: bool = False,
+                       scroll_iterations: int = 1,
+                       stealth: bool = False,
+                       include_html: bool = False,
+                       max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                       format: str = "text",
+                       max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                       **kwargs) -> ToolResult:
+        """
+        Fetch one or more web pages and return their visible text content.
+
+        Args:
+            url: The URL of the page to fetch
+            urls: Several URLs to fetch concurrently (instead of url)
+            selector: CSS selector to scope the extraction to one element
+            javascript: JavaScript to run on the page before extraction
+            wait_time: Seconds to wait for dynamic content after navigation
+            force_refresh: Bypass the content cache for this call
+            extract_links: Append a list of the page's links to the output
+            extract_images: Append a list of the page's images to the output
+            scroll: Scroll through the page first to trigger lazy loading
+            scroll_iterations: Bottom-of-page jumps for infinite scroll
+            stealth: Simulate human-like activity on challenge-prone sites
+            include_html: Append the page's raw HTML to the output
+            max_text_chars: Truncate extracted text to this many characters;
+                0 with extract_links/extract_images skips the text entirely
+            format: "text" (default) or "json" for a machine-readable dict
+            max_concurrency: Upper bound on simultaneous fetches for urls
+        """
+        print(f"Web tool called with url: {url}, args: {kwargs}")
+
+        if urls:
+            return await self.call_batch(urls, selector, javascript, wait_time,
+                                         max_concurrency=max_concurrency,
+                                         force_refresh=force_refresh,
+                                         extract_links=extract_links,
+                                         extract_images=extract_images,
+                                         scroll=scroll,
+                                         scroll_iterations=scroll_iterations,
+                                         stealth=stealth,
+                                         include_html=include_html,
+                                         max_text_chars=max_text_chars,
+                                         format=format)
+
+        if not url:
+            return ToolResult(error="No URL provided.")
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+
+        content, error = await self._fetch_cached(
+            url, selector, javascript, wait_time, force_refresh,
+            extract_links, extract_images, scroll, stealth, include_html,
+            max_text_chars, scroll_iterations, format)
+        if error:
+            return ToolResult(error=error)
+        return ToolResult(output=content)
+
+    async def call_batch(self, urls: List[str], selector: str = None,
+                         javascript: str = None,
+                         wait_time: float = DEFAULT_WAIT_TIME,
+                         max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                         force_refresh: bool = False,
+                         extract_links: bool = False,
+                         extract_images: bool = False,
+                         scroll: bool = False,
+                         scroll_iterations: int = 1,
+                         stealth: bool = False,
+                         include_html: bool = False,
+                         max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                         format: str = "text") -> ToolResult:
+        """
+        Fetch several URLs concurrently, sharing the warm browser.
+
+        Args:
+            urls: The URLs to fetch
+            selector: CSS selector applied to every page
+            javascript: JavaScript run on every page before extraction
+            wait_time: Seconds to wait for dynamic content per page
+            max_concurrency: Upper bound on simultaneous fetches
+            force_refresh: Bypass the content cache for every URL
+            extract_links: Append each page's links to its section
+            extract_images: Append each page's images to its section
+            scroll: Scroll through each page to trigger lazy loading
+            scroll_iterations: Bottom-of-page jumps for infinite scroll
+            stealth: Simulate human-like activity on challenge-prone sites
+            include_html: Append each page's raw HTML to its section
+            max_text_chars: Truncate each page's text to this many characters
+            format: "text" (default) or "json" per page section
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _fetch_one(u):
+            if not u.startswith(("http://", "https://")):
+                u = "https://" + u
+            async with sem, _host_sem(u):
+                return await self._fetch_cached(u, selector, javascript,
+                                                wait_time, force_refresh,
+                                                extract_links, extract_images,
+                                                scroll, stealth, include_html,
+                                                max_text_chars,
+                                                scroll_iterations, format)
+
+        # Gather in chunks so a thousand-URL batch doesn't hold a task and
+        # result string per URL in flight at once
+        results = []
+        for start in range(0, len(urls), BATCH_CHUNK_SIZE):
+            chunk = urls[start:start + BATCH_CHUNK_SIZE]
+            results.extend(await asyncio.gather(
+                *(_fetch_one(u) for u in chunk), return_exceptions=True))
+
+        sections = []
+        errors = 0
+        for u, result in zip(urls, results):
+            if isinstance(result, Exception):
+                errors += 1
+                sections.append(f"## {u}\n[error] {result}")
+                continue
+            content, error = result
+            if error:
+                errors += 1
+                sections.append(f"## {u}\n[error] {error}")
+            else:
+                sections.append(f"## {u}\n{content}")
+
+        output = "\n\n".join(sections)
+        if errors == len(urls):
+            return ToolResult(error=output)
+        return ToolResult(output=output)
+
+    async def _fetch_cached(self, url: str, selector: str = None,
+                            javascript: str = None,
+                            wait_time: float = DEFAULT_WAIT_TIME,
+                            force_refresh: bool = False,
+                            extract_links: bool = False,
+                            extract_images: bool = False,
+                            scroll: bool = False,
+                            stealth: bool = False,
+                            include_html: bool = False,
+                            max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                            scroll_iterations: int = 1,
+                            format: str = "text"):
+        """
+        Serve a page from the TTL cache, fetching and caching on miss.
+        Returns a (content, error) pair; exactly one side is set. The key
+        covers every option that shapes the output, so a links-only fetch
+        can't be served a text-only result (or vice versa).
+        """
+        key = (url, selector, javascript, extract_links, extract_images,
+               scroll, scroll_iterations, include_html, max_text_chars,
+               format)
+        if not force_refresh:
+            cached = _cache_get(key)
+            if cached is not None:
+                return cached, None
+
+        # Static pages don't need a browser at all; fall back to Playwright
+        # when the caller wants JavaScript, scrolling or stealth, or the
+        # fast path bails out
+        if javascript is None and not scroll and not stealth:
+            content = await self._try_static(url, selector,
+                                             extract_links, extract_images,
+                                             include_html, max_text_chars,
+                                             format)
+            if content is not None:
+                _cache_put(key, content)
+                return content, None
+
+        content, error = await self._get_page_content(
+            url, selector, javascript, wait_time,
+            extract_links, extract_images, scroll, stealth, include_html,
+            max_text_chars, scroll_iterations, format)
+        if error:
+            return None, error
+        _cache_put(key, content)
+        return content, None
+
+    async def _try_static(self, url: str, selector: str = None,
+                          extract_links: bool = False,
+                          extract_images: bool = False,
+                          include_html: bool = False,
+                          max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                          format: str = "text") -> Optional[str]:
+        """
+        Fetch a page over plain HTTP and extract its text without a browser.
+        Returns None whenever the response doesn't look like small static
+        HTML, handing the URL to the browser path instead.
+        """
+        if HTMLParser is None:
+            return None
+
+        # Stream the body so the status/content-type/size checks can bail
+        # out before the full download, and so an oversized page is
+        # abandoned mid-transfer instead of buffered and then discarded
+        try:
+            async with self._get_http_client().stream("GET", url) as response:
+                if response.status_code >= 400:
+                    return None
+                if "text/html" not in response.headers.get("content-type", ""):
+                    return None
+                raw = bytearray()
+                async for chunk in response.aiter_bytes():
+                    raw.extend(chunk)
+                    if len(raw) > STATIC_MAX_BYTES:
+                        return None
+                # One decode at the end beats per-chunk decoding; replace
+                # keeps a stray bad byte from scrapping the whole page
+                html = bytes(raw).decode(response.encoding or "utf-8",
+                                         errors="replace")
+        except httpx.HTTPError:
+            return None
+
+        # A challenge interstitial served statically is a dead end here;
+        # only the browser can run it to completion
+        if _TURNSTILE_RE.search(html):
+            return None
+
+        html_suffix = f"\n\n## HTML\n{html}" if include_html else ""
+
+        if (format == "json" or extract_links or extract_images) and not selector:
+            data = _extract_structured(html, extract_links,
+                                       extract_images, max_text_chars,
+                                       base_url=url)
+            if data is None:
+                return None
+            if format == "json":
+                if include_html:
+                    data["html"] = html
+                return _json_encode(data)
+            formatted = _format_structured(data)
+            return (formatted + html_suffix) if formatted else None
+
+        tree = HTMLParser(html)
+        if selector:
+            node = tree.css_first(selector)
+            if node is None:
+                return None
+            text = node.text(separator="\n")
+        else:
+            body = tree.body
+            if body is None:
+                return None
+            for node in body.css("script,style,noscript"):
+                node.decompose()
+            text = body.text(separator="\n")
+
+        text = self._clean_content(text)[:max_text_chars]
+        if not text:
+            return None
+        if format == "json":
+            payload: Dict[str, Any] = {"text": text}
+            if include_html:
+                payload["html"] = html
+            return _json_encode(payload)
+        return text + html_suffix
+
+    @staticmethod
+    async def _route_request(route):
+        """
+        Abort requests for resources that can't affect the page text, plus
+        anything aimed at a known tracker host. Image extraction still
+        works with images aborted — the src attributes are in the DOM
+        whether or not the bytes ever load.
+        """
+        request = route.request
+        if (request.resource_type in BLOCKED_RESOURCE_TYPES
+                or _TRACKER_RE.search(request.url)):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _get_page_content(self, url: str, selector: str = None,
+                                javascript: str = None,
+                                wait_time: float = DEFAULT_WAIT_TIME,
+                                extract_links: bool = False,
+                                extract_images: bool = False,
+                                scroll: bool = False,
+                                stealth: bool = False,
+                                include_html: bool = False,
+                                max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                                scroll_iterations: int = 1,
+                                format: str = "text"):
+        """
+        Navigate to a URL in the shared browser and extract its text.
+        Returns a (content, error) pair rather than raising, so a failed
+        fetch never tears anything down and the caller skips a layer of
+        exception handling.
+        """
+        # Acquisition sits inside the try: a missing Chromium install or a
+        # context that won't open must come back as an error result too
+        pool = None
+        page = None
+        try:
+            context, pool = await self._get_context(
+                viewport=(DEFAULT_VIEWPORT["width"],
+                          DEFAULT_VIEWPORT["height"]))
+            page = await pool.acquire()
+
+            if selector:
+                content = await self._extract_selector(page, url, selector,
+                                                       javascript, wait_time)
+                if format == "json":
+                    content = _json_encode({"text": content})
+                return content, None
+
+            await self._goto_with_retries(page, url,
+                                          wait_until="domcontentloaded",
+                                          timeout=NAVIGATION_TIMEOUT_MS)
+
+            # domcontentloaded plus a short bounded settle beats waiting
+            # for networkidle, which never fires on pages that hold
+            # keep-alive or SSE connections open. wait_time stays an
+            # upper bound, not a floor
+            if wait_time > 0:
+                try:
+                    await page.wait_for_function(
+                        "document.readyState === 'complete'",
+                        timeout=wait_time * 1000)
+                    await asyncio.sleep(0.5)
+                except PlaywrightTimeoutError:
+                    pass  # Proceed with whatever made it onto the page
+
+            # Human-like activity is strictly opt-in: on sites that never
+            # challenge it's pure wall-clock waste
+            if stealth:
+                await self._simulate_human(page)
+
+            # Some challenges (e.g. non-interactive Turnstile) clear on
+            # their own; give them a bounded chance before giving up
+            if await self._detect_challenge(page):
+                if not await self._wait_challenge_resolved(page):
+                    return None, (f"{url} is showing an anti-bot challenge "
+                                  "page; its content could not be read.")
+
+            if scroll:
+                await self._scroll_page(page, scroll_iterations)
+
+            if javascript:
+                await page.evaluate(javascript)
+
+            # Serialize the DOM over CDP once; the same snapshot feeds
+            # structured extraction, the local text conversion and the
+            # optional raw-HTML section
+            content = None
+            html = None
+            if (format == "json" or extract_links or extract_images
+                    or include_html or HTMLParser is not None):
+                html = await page.content()
+
+                if format == "json" or extract_links or extract_images:
+                    data = _extract_structured(html, extract_links,
+                                               extract_images,
+                                               max_text_chars,
+                                               base_url=url)
+                    if data is not None:
+                        if format == "json":
+                            if include_html:
+                                data["html"] = html
+                            return _json_encode(data), None
+                        content = _format_structured(data)
+
+                # selectolax's native parser does the text conversion
+                # locally — cheaper than having Chromium compute innerText
+                # through its layout engine
+                if content is None and HTMLParser is not None:
+                    tree = HTMLParser(html)
+                    body = tree.body
+                    if body is not None:
+                        for node in body.css("script,style,noscript"):
+                            node.decompose()
+                        content = self._clean_content(
+                            body.text(separator="\n"))
+
+            if content is None:
+                # Collapse whitespace in-browser so the string crossing
+                # the CDP pipe is already clean; V8 does the regex work
+                # and the Python side has nothing left to do
+                content = await page.evaluate(
+                    "() => document.body.innerText"
+                    ".replace(/\\n(?:[ \\t]*\\n)+/g, '\\n\\n').trim()")
+
+            if max_text_chars:
+                content = content[:max_text_chars]
+
+            if format == "json":
+                payload: Dict[str, Any] = {"text": content}
+                if include_html and html is not None:
+                    payload["html"] = html
+                return _json_encode(payload), None
+
+            # Raw HTML is opt-in: it typically multiplies the bytes pushed
+            # through the model several-fold for no gain over the text
+            if include_html and html is not None:
+                content += f"\n\n## HTML\n{html}"
+            return content, None
+
+        except ToolError as e:
+            return None, e.message
+        except Exception as e:
+            return None, f"Failed to fetch {url}: {str(e)}"
+        finally:
+            # The page goes back to the pool blanked; the context and
+            # browser stay warm for the next call
+            if page is not None:
+                await pool.release(page)
+
+    @staticmethod
+    async def _simulate_human(page):
+        """
+        Dispatch a short burst of mouse movement and gentle scrolling so
+        behavioral challenge scoring sees activity. Runs as one
+        page.evaluate, like _scroll_page.
+        """
+        await page.evaluate("""
+        async () => {
+            for (let i = 0; i < 5; i++) {
+                document.dispatchEvent(new MouseEvent('mousemove', {
+                    clientX: Math.random() * window.innerWidth,
+                    clientY: Math.random() * window.innerHeight,
+                    bubbles: true,
+                }));
+                window.scrollBy(0, 40 + Math.random() * 80);
+                await new Promise(r => setTimeout(r, 100 + Math.random() * 200));
+            }
+            window.scrollTo(0, 0);
+        }
+        """)
+
+    @staticmethod
+    async def _scroll_page(page, iterations: int = 1):
+        """
+        Trigger lazy-loaded content with one-shot jumps to the bottom of
+        the page — IntersectionObserver handlers fire on the jump just as
+        they would on step-scrolling, without the per-viewport pacing.
+        Each jump is followed by a bounded wait for lazy images to finish
+        loading; infinite-scroll pages can ask for extra iterations to
+        pick up content appended below the previous bottom.
+        """
+        for _ in range(max(iterations, 1)):
+            await page.evaluate(
+                "() => window.scrollTo(0, document.body.scrollHeight)")
+            try:
+                await page.wait_for_function(
+                    "() => Array.from(document.querySelectorAll("
+                    "'img[loading=lazy]')).every(img => img.complete)",
+                    timeout=2000)
+            except PlaywrightTimeoutError:
+                pass  # Accept whatever made it; don't hold the fetch
+        await page.evaluate("() => window.scrollTo(0, 0)")
+
+    @staticmethod
+    async def _detect_challenge(page) -> bool:
+        """
+        Check whether the page is an anti-bot challenge interstitial.
+        Every selector probe and the text scan run inside one
+        page.evaluate, so detection costs a single CDP round-trip rather
+        than one per selector plus a full page.content() serialization.
+        """
+        try:
+            result = await page.evaluate(_CHALLENGE_PROBE_JS)
+        except Exception:
+            return False
+        return result["hit"] or bool(_CHALLENGE_RE.search(result["text"]))
+
+    @staticmethod
+    async def _wait_challenge_resolved(
+            page, max_wait: float = CHALLENGE_WAIT_SECONDS) -> bool:
+        """
+        Wait for a detected challenge to clear. One wait_for_function
+        polls the challenge-gone predicate inside the browser, instead of
+        a Python sleep loop re-serializing page.content() every pass.
+        """
+        try:
+            await page.wait_for_function(_CHALLENGE_GONE_JS,
+                                         timeout=max_wait * 1000,
+                                         polling=1500)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    @staticmethod
+    async def _goto_with_retries(page, url: str, **kwargs):
+        """
+        Navigate with exponential backoff and full jitter. Only timeouts
+        and transient net::ERR_* failures are retried — flaky sites drop
+        the occasional connection, and without the retry one blip loses
+        the whole call. DNS and refused-connection errors short-circuit:
+        retrying those only burns time. The random sleep in [0, cap)
+        keeps a batch of failures from retrying in lockstep against the
+        same host.
+        """
+        for attempt in range(GOTO_MAX_ATTEMPTS):
+            try:
+                return await page.goto(url, **kwargs)
+            except (PlaywrightTimeoutError, PlaywrightError) as e:
+                transient = (isinstance(e, PlaywrightTimeoutError)
+                             or "net::ERR_" in str(e))
+                if (not transient or _UNRECOVERABLE_ERR_RE.search(str(e))
+                        or attempt == GOTO_MAX_ATTEMPTS - 1):
+                    raise
+                await asyncio.sleep(random.uniform(0, min(
+                    RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))))
+
+    async def _extract_selector(self, page, url: str, selector: str,
+                                javascript: str = None,
+                                wait_time: float = DEFAULT_WAIT_TIME) -> str:
+        """
+        Extract one selector's text without waiting for the full page load.
+        Navigation only waits for the initial commit; wait_time then
+        bounds the post-commit wait for the selector, and loading is
+        stopped as soon as the text is in hand — heavy pages don't get
+        to finish downloading their long tail.
+        """
+        await self._goto_with_retries(page, url, wait_until="commit",
+                                      timeout=NAVIGATION_TIMEOUT_MS)
+
+        # state="attached" fires as soon as the node exists in the DOM;
+        # inner_text doesn't care whether it has painted yet. The clock
+        # starts only now, after commit, so a slow site or a retried
+        # navigation can't eat the selector's budget
+        try:
+            await page.wait_for_selector(selector, state="attached",
+                                         timeout=max(wait_time, 1) * 1000)
+        except PlaywrightTimeoutError:
+            raise ToolError(f"No element matches selector: {selector}")
+
+        if javascript:
+            await page.evaluate(javascript)
+
+        content = await page.inner_text(selector)
+
+        # We have what we came for; halt any remaining requests
+        try:
+            await page.evaluate("() => window.stop()")
+        except Exception:
+            pass
+        return self._clean_content(content)
+
+    def _clean_content(self, content: str) -> str:
+        """Collapse the blank-line runs page layout leaves behind."""
+        return _MULTI_NEWLINE.sub('\n\n', content).strip()
+
+    # Static schema, built once at class definition; to_params() returns the
+    # shared dict instead of reallocating it on every call
+    _PARAMS: ClassVar[BetaToolUnionParam] = {
+        "type": api_type,
+        "name": name,
+        "function": {
+            "name": name,
+            "description": "Fetch a web page in a headless browser and return its visible text content, optionally scoped to a CSS selector or after running JavaScript on the page.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The URL of the page to fetch"
+                    },
+                    "urls": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
+                        },
+                        "description": "Several URLs to fetch concurrently (instead of url)"
+                    },
+                    "max_concurrency": {
+                        "type": "integer",
+                        "description": "Upper bound on simultaneous fetches when urls is used",
+                        "default": 5
+                    },
+                    "selector": {
+                        "type": "string",
+                        "description": "CSS selector to scope the extraction to one element"
+                    },
+                    "javascript": {
+                        "type": "string",
+                        "description": "JavaScript to run on the page before extraction"
+                    },
+                    "wait_time": {
+                        "type": "number",
+                        "description": "Seconds to wait for dynamic content after navigation",
+                        "default": 5
+                    },
+                    "force_refresh": {
+                        "type": "boolean",
+                        "description": "Refetch even if the page was fetched recently",
+                        "default": False
+                    },
+                    "extract_links": {
+                        "type": "boolean",
+                        "description": "Append a list of the page's links to the output",
+                        "default": False
+                    },
+                    "extract_images": {
+                        "type": "boolean",
+                        "description": "Append a list of the page's images to the output",
+                        "default": False
+                    },
+                    "scroll": {
+                        "type": "boolean",
+                        "description": "Scroll through the page first to trigger lazy-loaded content",
+                        "default": False
+                    },
+                    "scroll_iterations": {
+                        "type": "integer",
+                        "description": "With scroll, how many bottom-of-page jumps to make for infinite-scroll pages",
+                        "default": 1
+                    },
+                    "stealth": {
+                        "type": "boolean",
+                        "description": "Simulate human-like activity for sites that show anti-bot challenges",
+                        "default": False
+                    },
+                    "include_html": {
+                        "type": "boolean",
+                        "description": "Append the page's raw HTML to the output (large)",
+                        "default": False
+                    },
+                    "max_text_chars": {
+                        "type": "integer",
+                        "description": "Truncate the extracted text to this many characters; 0 with extract_links/extract_images returns just the lists",
+                        "default": 200000
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["text", "json"],
+                        "description": "Output format: human-readable text (default) or a JSON object with title/text/links/images fields",
+                        "default": "text"
+                    }
+                },
+                "required": [],
+            },
+        },
+    }
+
+    def to_params(self) -> BetaToolUnionParam:
+        return self._PARAMS
+
+
+def _shutdown_at_exit():
+    """Best-effort close of the shared browser when the process exits."""
+    if WebTool._browser is None:
+        return
+    try:
+        asyncio.run(WebTool.shutdown())
+    except RuntimeError:
+        # A loop is still running (or already closed); let the OS reap Chromium
+        pass
+
+
+atexit.register(_shutdown_at_exit)
@@ -4,16 +4,11 @@ Test script for the new TestTool in Open Interpreter.
 This script demonstrates how to use the new TestTool.
 """
 
-from development.interpreter.tools.collection import ToolCollection
-from development.interpreter.tools.test import TestTool
-from development.interpreter.interpreter import Interpreter
-import sys
-import os
 import asyncio
-from pathlib import Path
 
-# Add the development directory to the path so we can import the interpreter module
-sys.path.append(str(Path(__file__).parent.parent.parent))
+from interpreter.interpreter import Interpreter
+from interpreter.tools.collection import ToolCollection
+from interpreter.tools.test import TestTool
 
 
 async def main():